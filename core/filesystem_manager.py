@@ -1,126 +1,373 @@
+import ast
+import hashlib
+import os
+import re
+import stat
+import fnmatch
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from rich.console import Console
 from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.syntax import Syntax    
+from rich.text import Text
+
+from lib.paste_detector import format_size
 
 console = Console()
 
+_now = datetime.now
+
+# Batas detik -> (pembagi, suffix) untuk _format_time_ago
+_TIME_AGO_BOUNDS = (60, 3600, 86400)
+_TIME_AGO_UNITS = ((1, 's'), (60, 'm'), (3600, 'h'), (86400, 'd'))
+
+_Syntax = None  # rich.syntax (Pygments) di-import saat cat() pertama butuh highlight
+
+MAX_CAT_INLINE = 262144  # file lebih besar dari ini di-stream, tidak dibaca sekaligus
+CAT_PREVIEW_LINES = 500
+CAT_HIGHLIGHT_FULL_CHARS = 50_000  # di atas ini hanya CAT_PREVIEW_LINES pertama yang di-highlight
+MAX_HIGHLIGHT_CHARS = 100_000  # di atas ini Pygments terlalu lambat, tampilkan plain
+MAX_HIGHLIGHT_LINES = 2000
+MAX_CONTEXT_FILE_SIZE = 500_000
+# Context file di atas ini tidak di-embed, diganti ringkasan referensi (hash, baris, defs)
+SUMMARY_THRESHOLD = 64 * 1024
+SUMMARY_EDGE_LINES = 20
+SUMMARY_MAX_DEFS = 200  # ringkasan harus jauh di bawah budget embed (MAX_EMBED_CHARS)
+MAX_READ_WORKERS = 16
+
+SUFFIX_TO_LEXER = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.h': 'c',
+    '.css': 'css',
+    '.html': 'html'
+}
+
+
+# scandir(fd): stat() per entry jadi fstatat(dirfd, name), tanpa path walk ulang
+_SCANDIR_FD = os.scandir in os.supports_fd
+_O_DIRECTORY = getattr(os, 'O_DIRECTORY', 0)
+_STAT_DIR_FD = os.stat in os.supports_dir_fd
+_O_NONBLOCK = getattr(os, 'O_NONBLOCK', 0)  # open() FIFO tidak nge-block sebelum cek S_ISREG
+
+
+def _scan_dir(dirpath, skip=None):
+    """
+    Probe isi directory: tipe + ukuran saja, satu stat per file
+
+    Args:
+        dirpath (str): Directory yang di-list
+        skip (callable): Predicate nama entry yang dilewati sebelum stat
+
+    Returns:
+        list: [(name, is_dir, is_symlink, size)], size None untuk directory
+    """
+    fd = os.open(dirpath, os.O_RDONLY | _O_DIRECTORY) if _SCANDIR_FD else None
+    try:
+        entries = []
+        # stat() harus selesai selagi fd masih terbuka
+        with os.scandir(dirpath if fd is None else fd) as it:
+            for entry in it:
+                name = entry.name
+                if skip is not None and skip(name):
+                    continue
+                is_dir = entry.is_dir()
+                size = None
+                if not is_dir:
+                    try:
+                        size = entry.stat().st_size
+                    except OSError:
+                        size = 0  # broken symlink
+                entries.append((name, is_dir, entry.is_symlink(), size))
+        return entries
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def _stat_grouped(paths):
+    """
+    stat banyak file dikelompokkan per parent: directory dibuka sekali,
+    tiap file di-stat relatif ke fd-nya (tanpa resolve path penuh)
+
+    Args:
+        paths (list): Path file (str)
+
+    Returns:
+        list: os.stat_result atau OSError per path, urutan sama dengan input
+    """
+    by_dir = {}
+    for i, path in enumerate(paths):
+        by_dir.setdefault(os.path.dirname(path) or '.', []).append(i)
+    
+    results = [None] * len(paths)
+    for parent, indexes in by_dir.items():
+        fd = None
+        if _STAT_DIR_FD:
+            try:
+                fd = os.open(parent, os.O_RDONLY | _O_DIRECTORY)
+            except OSError:
+                pass  # stat per path di bawah melaporkan error aslinya
+        try:
+            for i in indexes:
+                path = paths[i]
+                try:
+                    if fd is None:
+                        results[i] = os.stat(path)
+                    else:
+                        results[i] = os.stat(os.path.basename(path), dir_fd=fd)
+                except OSError as e:
+                    e.filename = path  # pesan error tetap pakai path penuh
+                    results[i] = e
+        finally:
+            if fd is not None:
+                os.close(fd)
+    return results
+
+
+def _summarize_file(name, data, digest):
+    """Ringkasan referensi file besar: sha256, jumlah baris, top-level defs atau head/tail"""
+    text = data.decode('utf-8')
+    lines = text.splitlines()
+    header = f"[file: {name} | sha256: {digest} | {len(lines)} lines | {format_size(len(data))}]"
+    
+    if name.endswith('.py'):
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            tree = None
+        if tree is not None:
+            defs = [
+                f"{'class' if isinstance(node, ast.ClassDef) else 'def'} {node.name}"
+                for node in tree.body
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+            ]
+            listed = ', '.join(defs[:SUMMARY_MAX_DEFS]) or '-'
+            if len(defs) > SUMMARY_MAX_DEFS:
+                listed += f", ... +{len(defs) - SUMMARY_MAX_DEFS} more"
+            return f"{header}\ntop-level defs: {listed}"
+    
+    elided = len(lines) - 2 * SUMMARY_EDGE_LINES
+    if elided <= 0:
+        return f"{header}\n{text}"
+    head = '\n'.join(lines[:SUMMARY_EDGE_LINES])
+    tail = '\n'.join(lines[-SUMMARY_EDGE_LINES:])
+    return f"{header}\n{head}\n... ({elided} lines elided) ...\n{tail}"
+
+
+@lru_cache(maxsize=128)
+def _compile_glob(pattern):
+    """Glob -> compiled regex, di-cache untuk pattern dinamis (@add/@remove)"""
+    return re.compile(fnmatch.translate(pattern))
+
+
+# Ekstensi yang pasti binary: ditolak tanpa stat/open sama sekali
+_BINARY_EXTS = frozenset({
+    '.so', '.pyc', '.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip',
+    '.tar', '.gz', '.o', '.a', '.exe', '.dll', '.class'
+})
+
+_has_magic = re.compile(r'[*?\[]').search
+
+
+def _head_lines(text, n):
+    """Potong text setelah n baris pertama tanpa split seluruh isi"""
+    end = -1
+    for _ in range(n):
+        end = text.find('\n', end + 1)
+        if end == -1:
+            return text
+    return text[:end]
+
+
+def _get_syntax():
+    """Lazy import rich.syntax.Syntax, dibayar sekali saja"""
+    global _Syntax
+    if _Syntax is None:
+        from rich.syntax import Syntax
+        _Syntax = Syntax
+    return _Syntax
+
 
 class FileSystemManager:
     def __init__(self):
         self.home_dir = Path.home()
         self.current_dir = Path.cwd()
+        # Cache bentuk resolved (str) supaya ls/cat/tree tidak resolve() ulang
+        self._home_resolved = os.path.realpath(self.home_dir)
+        self._home_prefix = self._home_resolved.rstrip(os.sep) + os.sep
+        self._current_resolved = os.path.realpath(self.current_dir)
+        # Memo per instance; home_dir tidak berubah selama session jadi tidak perlu invalidasi
+        self._is_within_home = lru_cache(maxsize=4096)(self._check_within_home)
         self.prev_dir = self.current_dir
         self.context_files = {}  # {display_name: Path_object}
+        self._context_stats = {}  # {display_name: (st_size, st_mtime_ns)} dari stat saat @add
+        self._content_cache = {}  # {display_name: ((st_mtime_ns, st_size), content, sha256)}
+        self._folders = {}  # {parent_dir: jumlah file di context}, di-update per add/remove
         self.paste_contexts = {}  # NEW: {paste_id: {"content": str, "timestamp": datetime, "lines": int, "size": int}}
         self.paste_counter = 0  # NEW: Counter for paste IDs
         self.ignore_patterns = [
             '*.pyc', '__pycache__', '.git', 
             'node_modules', '.env', '*.so', '*.pyc'
         ]
+        # Nama literal (.git, node_modules) cukup hash lookup; sisanya (glob) satu regex
+        self._literal_ignores = frozenset(
+            p for p in self.ignore_patterns if not any(c in p for c in '*?[')
+        )
+        self._ignore_re = re.compile('|'.join(
+            f'(?:{fnmatch.translate(p)})' for p in self.ignore_patterns
+            if p not in self._literal_ignores
+        ) or r'(?!)')
     
     def is_path_allowed(self, target_path):
         """Cek apakah path masih dalam home directory"""
         try:
-            resolved = Path(target_path).resolve()
-            return resolved.is_relative_to(self.home_dir)
-        except Exception:
+            resolved = os.path.realpath(target_path)
+        except (OSError, ValueError):
             return False
+        return self._is_within_home(resolved)
+    
+    def _check_within_home(self, resolved):
+        """Cek path yang sudah resolved (str) via prefix, tanpa syscall"""
+        return resolved == self._home_resolved or resolved.startswith(self._home_prefix)
+    
+    def _resolve_target(self, path=None):
+        """Resolve path (str) relatif ke current_dir, skip realpath untuk child langsung"""
+        if path is None:
+            return self._current_resolved
+        path = os.fspath(path)
+        joined = os.path.join(self._current_resolved, path)
+        if os.sep not in path and path not in ('.', '..') and not os.path.islink(joined):
+            return joined
+        return os.path.realpath(joined)
+    
+    def _stat_and_validate(self, path=None):
+        """
+        Resolve, cek home boundary, lalu satu os.stat untuk target
+
+        Returns:
+            tuple: (resolved: str, st) dengan st = os.stat_result,
+                   None jika path tidak ada, atau False jika di luar home
+        """
+        resolved = self._resolve_target(path)
+        if not self._is_within_home(resolved):
+            return resolved, False
+        try:
+            return resolved, os.stat(resolved)
+        except OSError:
+            return resolved, None
     
     def cd(self, path=None):
         """Change directory dengan validasi"""
         if path is None:
-            target = self.home_dir
-        elif path == '..':
-            target = self.current_dir.parent
+            path = self.home_dir
         elif path == '-':
-            target = self.prev_dir
-        else:
-            if Path(path).is_absolute():
-                target = Path(path)
-            else:
-                target = self.current_dir / path
+            path = self.prev_dir
         
-        target = target.resolve()
+        # Absolute path / '..' tetap di-realpath oleh _resolve_target
+        target, st = self._stat_and_validate(path)
         
-        if not self.is_path_allowed(target):
+        if st is False:
             console.print("[red]❌ Access denied: outside home directory[/red]")
             return False
             
-        if not target.exists():
+        if st is None:
             console.print(f"[red]❌ Directory not found: {target}[/red]")
             return False
             
-        if not target.is_dir():
+        if not stat.S_ISDIR(st.st_mode):
             console.print(f"[red]❌ Not a directory: {target}[/red]")
             return False
         
         self.prev_dir = self.current_dir
-        self.current_dir = target
+        self.current_dir = Path(target)
+        self._current_resolved = target
         console.print(f"[green]✓[/green] [dim]{self.current_dir}[/dim]")
         return True
     
     def ls(self, path=None):
         """List directory contents"""
-        target = self.current_dir if path is None else self.current_dir / path
-        target = target.resolve()
+        target, st = self._stat_and_validate(path)
         
-        if not self.is_path_allowed(target):
+        if st is False:
             console.print("[red]❌ Access denied[/red]")
             return
             
-        if not target.exists():
+        if st is None:
             console.print(f"[red]❌ Path not found: {target}[/red]")
             return
         
         try:
-            items = sorted(target.iterdir(), key=lambda x: (not x.is_dir(), x.name))
-            for item in items:
-                if item.is_dir():
-                    console.print(f"[bold blue]📁 {item.name}/[/bold blue]")
+            # Tipe dari readdir, ukuran dari satu fstatat per file; tuple sudah
+            # membawa is_dir, jadi sort tidak memicu syscall lagi
+            entries = _scan_dir(target)
+            entries.sort(key=lambda e: (not e[1], e[0]))
+            for name, is_dir, _, size in entries:
+                if is_dir:
+                    console.print(f"[bold blue]📁 {name}/[/bold blue]")
                 else:
-                    size = item.stat().st_size
                     size_str = self._format_size(size)
-                    console.print(f"[white]📄 {item.name}[/white] [dim]({size_str})[/dim]")
+                    console.print(f"[white]📄 {name}[/white] [dim]({size_str})[/dim]")
         except PermissionError:
             console.print("[red]❌ Permission denied[/red]")
     
     def cat(self, filepath):
         """Read file content"""
-        target = self.current_dir / filepath
-        target = target.resolve()
+        resolved = self._resolve_target(filepath)
         
-        if not self.is_path_allowed(target):
+        if not self._is_within_home(resolved):
             console.print("[red]❌ Access denied[/red]")
             return None
-            
-        if not target.exists():
+        
+        target = Path(resolved)
+        
+        # Satu open + satu fstat menggantikan exists() + is_file() + stat() + read_text()
+        try:
+            fd = os.open(resolved, os.O_RDONLY | _O_NONBLOCK)
+        except FileNotFoundError:
             console.print(f"[red]❌ File not found: {filepath}[/red]")
             return None
-            
-        if not target.is_file():
+        except OSError as e:
+            console.print(f"[red]❌ Error reading file: {e}[/red]")
+            return None
+        
+        try:
+            raw = None
+            st = os.fstat(fd)
+            if stat.S_ISREG(st.st_mode) and st.st_size <= MAX_CAT_INLINE:
+                raw = os.read(fd, st.st_size)
+        except OSError as e:
+            console.print(f"[red]❌ Error reading file: {e}[/red]")
+            return None
+        finally:
+            os.close(fd)
+        
+        if not stat.S_ISREG(st.st_mode):
             console.print(f"[red]❌ Not a file: {filepath}[/red]")
             return None
         
         try:
-            content = target.read_text(encoding='utf-8')
-            # Detect jika file code, syntax highlight
-            suffix_to_lexer = {                                                    
-             '.py': 'python',                                                   
-             '.js': 'javascript',                                               
-             '.java': 'java',                                                   
-             '.cpp': 'cpp',                                                     
-             '.c': 'c',                                                         
-             '.h': 'c',                                                         
-             '.css': 'css',                                                     
-             '.html': 'html'                                                    
-         }    
+            if raw is None:
+                return self._cat_large(target, filepath)
             
-            if target.suffix in suffix_to_lexer:                                   
-                lexer_name = suffix_to_lexer[target.suffix]                        
-                syntax = Syntax(content, lexer_name, theme="monokai", line_numbers=True)        
-                console.print(syntax)
+            content = raw.decode('utf-8')
+            # Detect jika file code, syntax highlight
+            lexer_name = SUFFIX_TO_LEXER.get(target.suffix)
+            if lexer_name:
+                head = content
+                if (len(content) > CAT_HIGHLIGHT_FULL_CHARS
+                        or content.count('\n') > MAX_HIGHLIGHT_LINES):
+                    # Highlight hanya layar awal, sisa file tidak di-tokenize
+                    head = _head_lines(content, CAT_PREVIEW_LINES)
+                self._print_code(head, lexer_name, filepath)
+                if len(head) < len(content):
+                    self._page_rest((content[len(head) + 1:],), filepath)
             else:
                 console.print(Panel(content, title=str(filepath), border_style="cyan"))
             return content
@@ -131,77 +378,183 @@ class FileSystemManager:
             console.print(f"[red]❌ Error reading file: {e}[/red]")
             return None
     
+    def _cat_large(self, target, filepath):
+        """Tampilkan file besar tanpa load seluruh isi ke memory"""
+        lexer_name = SUFFIX_TO_LEXER.get(target.suffix)
+        if lexer_name:
+            # Syntax.from_path tetap membaca seluruh file; baca baris awal saja
+            with target.open('r', encoding='utf-8') as f:
+                head = ''.join(islice(f, CAT_PREVIEW_LINES)).rstrip('\n')
+                self._print_code(head, lexer_name, filepath)
+                # Sisa file dibaca per baris langsung ke pager
+                self._page_rest(f, filepath)
+        else:
+            with target.open('r', encoding='utf-8') as f, console.pager():
+                for line in f:
+                    console.print(line, end='', markup=False, highlight=False)
+        return None
+    
+    def _print_code(self, head, lexer_name, filepath):
+        """Syntax highlight potongan code, plain jika terlalu besar untuk Pygments"""
+        if len(head) > MAX_HIGHLIGHT_CHARS:
+            # File code minified (baris sangat panjang): skip highlight, isi tetap utuh
+            console.print(Panel(Text(head), title=str(filepath), border_style="cyan"))
+            return
+        console.print(_get_syntax()(head, lexer_name, theme="monokai", line_numbers=True))
+    
+    def _page_rest(self, chunks, filepath):
+        """Sisa file setelah baris yang di-highlight: plain lewat pager, tidak di-tokenize"""
+        chunks = iter(chunks)
+        first = next(chunks, '')
+        if not first:
+            return  # file berakhir tepat di batas preview
+        console.print(f"[dim]... lines after {CAT_PREVIEW_LINES} of {filepath} shown in pager[/dim]")
+        with console.pager():
+            console.print(first, end='', markup=False, highlight=False)
+            for chunk in chunks:
+                console.print(chunk, end='', markup=False, highlight=False)
+    
     def pwd(self):
         """Print working directory"""
         console.print(f"[cyan]{self.current_dir}[/cyan]")
         return str(self.current_dir)
     
-    def tree(self, path=None, max_depth=3, current_depth=0, prefix=""):
+    def tree(self, path=None, max_depth=3):
         """Display directory tree structure"""
-        target = self.current_dir if path is None else self.current_dir / path
-        target = target.resolve()
+        target, st = self._stat_and_validate(path)
         
-        if not self.is_path_allowed(target):
+        if st is False:
             console.print("[red]❌ Access denied[/red]")
             return
             
-        if not target.exists():
+        if st is None:
             console.print(f"[red]❌ Path not found[/red]")
             return
         
-        if current_depth == 0:
-            console.print(f"[bold cyan]{target.name or target}/[/bold cyan]")
+        # Kumpulkan semua baris, render sekali di akhir (satu console.print)
+        lines = [f"[bold cyan]{os.path.basename(target) or target}/[/bold cyan]"]
         
-        if not target.is_dir() or current_depth >= max_depth:
-            return
+        if stat.S_ISDIR(st.st_mode) and max_depth > 0:
+            self._build_tree(target, max_depth, lines)
+        
+        console.print("\n".join(lines))
+    
+    def _build_tree(self, target, max_depth, lines):
+        """Append baris tree (markup) ke lines"""
+        # Bind ke local: hindari LOAD_ATTR berulang di loop
+        literal_ignores = self._literal_ignores
+        ignore = self._ignore_re.match
+        emit = lines.append
+        format_size = self._format_size
+        
+        def skip(name):
+            return name in literal_ignores or ignore(name) is not None
+        
+        def scan(dirpath):
+            # Filter ignore_patterns langsung saat scandir, sebelum sort/stat/descend
+            entries = _scan_dir(dirpath, skip)
+            entries.sort(key=lambda e: (not e[1], e[0].lower()))
+            return entries
         
         try:
-            items = sorted(target.iterdir(), 
-                          key=lambda x: (not x.is_dir(), x.name.lower()))
+            entries = scan(target)
+        except PermissionError:
+            emit("[red]❌ Permission denied[/red]")
+            return
+        
+        # DFS iteratif: stack of (iterator, index terakhir, prefix, depth, dirpath)
+        stack = [(enumerate(entries), len(entries) - 1, "", 0, target)]
+        while stack:
+            it, last, prefix, depth, dirpath = stack[-1]
+            item = next(it, None)
+            if item is None:
+                stack.pop()
+                continue
             
-            items = [item for item in items 
-                    if not any(item.match(pattern) for pattern in self.ignore_patterns)]
+            i, (name, is_dir, is_link, size) = item
+            is_last = (i == last)
+            current_prefix = "└── " if is_last else "├── "
+            child_prefix = prefix + ("    " if is_last else "│   ")
             
-            for i, item in enumerate(items):
-                is_last = (i == len(items) - 1)
-                current_prefix = "└── " if is_last else "├── "
-                child_prefix = "    " if is_last else "│   "
-                
-                if item.is_dir():
-                    console.print(f"[dim]{prefix}{current_prefix}[/dim][blue]📁 {item.name}/[/blue]")
-                    self.tree(item, max_depth, current_depth + 1, prefix + child_prefix)
-                else:
-                    size = self._format_size(item.stat().st_size)
-                    console.print(f"[dim]{prefix}{current_prefix}[/dim][white]{item.name}[/white] [dim]({size})[/dim]")
-                    
-        except PermissionError:
-            console.print(f"[dim]{prefix}[/dim][red]❌ Permission denied[/red]")
+            if not is_dir:
+                emit(f"[dim]{prefix}{current_prefix}[/dim][white]{name}[/white] [dim]({format_size(size)})[/dim]")
+                continue
+            
+            emit(f"[dim]{prefix}{current_prefix}[/dim][blue]📁 {name}/[/blue]")
+            if depth + 1 >= max_depth:
+                continue
+            
+            child = os.path.join(dirpath, name)
+            # Symlink bisa keluar dari home, validasi sebelum descend
+            if is_link and not self.is_path_allowed(child):
+                emit(f"[dim]{child_prefix}[/dim][red]❌ Access denied[/red]")
+                continue
+            
+            try:
+                children = scan(child)
+            except PermissionError:
+                emit(f"[dim]{child_prefix}[/dim][red]❌ Permission denied[/red]")
+                continue
+            stack.append((enumerate(children), len(children) - 1, child_prefix, depth + 1, child))
     
     def add_to_context(self, pattern):
         """Add file(s) to AI context"""
+        # matches berisi DirEntry (dari scandir) atau Path; keduanya punya
+        # is_file()/stat()/name, dan DirEntry menyimpan hasil stat() sekali saja
         if '*' in pattern or '?' in pattern:
-            matches = list(self.current_dir.glob(pattern))
+            # Lazy: size/binary check jalan per match, tanpa materialize list dulu
+            matches = self._iter_glob(pattern)
         else:
-            target = self.current_dir / pattern
-            if target.is_dir():
-                matches = list(target.glob('*'))
+            target = os.path.join(self._current_resolved, pattern)
+            if os.path.isdir(target):
+                with os.scandir(target) as it:
+                    matches = list(it)
             else:
-                matches = [target] if target.exists() else []
+                matches = [Path(target)] if os.path.exists(target) else []
 
+        # realpath per parent directory, di-memo hanya selama satu @add:
+        # file sefolder tidak me-resolve ulang rantai parent yang sama
+        real_dir = lru_cache(maxsize=1024)(os.path.realpath)
+        
         added = 0
         for match in matches:
-            if match.is_file() and self.is_path_allowed(match):
-                if match.stat().st_size > 500_000:
+            # DirEntry: is_file() dari cache scandir, subdirectory lewat tanpa stat
+            if isinstance(match, os.DirEntry) and not match.is_file():
+                continue
+            # Ekstensi yang pasti binary ditolak sebelum stat/realpath
+            if os.path.splitext(match.name)[1].lower() in _BINARY_EXTS:
+                console.print(f"[yellow]⚠️  Skipped (binary): {match.name}[/yellow]")
+                continue
+            # Satu stat per file: tipe, ukuran dan mtime dipakai ulang di bawah
+            try:
+                st = match.stat()
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            path = os.fspath(match)
+            if match.is_symlink():
+                abs_path = os.path.realpath(path)
+            else:
+                abs_path = os.path.join(real_dir(os.path.dirname(path)), os.path.basename(path))
+            
+            if self._is_within_home(abs_path):
+                size = st.st_size
+                if size > MAX_CONTEXT_FILE_SIZE:
                     console.print(f"[yellow]⚠️  Skipped (too large): {match.name}[/yellow]")
                     continue
                 
-                if self._is_binary(match):
+                # File kosong pasti bukan binary, skip probe
+                if size and self._is_binary(match):
                     console.print(f"[yellow]⚠️  Skipped (binary): {match.name}[/yellow]")
                     continue
                 
-                # ✅ Simpan dengan absolute path sebagai key
-                abs_path = str(match.resolve())
-                self.context_files[abs_path] = match
+                # ✅ Simpan dengan absolute path (resolved) sebagai key
+                if abs_path not in self.context_files:
+                    parent = os.path.dirname(abs_path)
+                    self._folders[parent] = self._folders.get(parent, 0) + 1
+                self.context_files[abs_path] = Path(match)
+                self._context_stats[abs_path] = (size, st.st_mtime_ns)
                 added += 1
 
         if added:
@@ -211,23 +564,111 @@ class FileSystemManager:
             console.print("[yellow]⚠️  No files added[/yellow]")
 
     
+    def _iter_glob(self, pattern):
+        """
+        Walk glob pattern dengan os.scandir, yield file yang match secara lazy
+
+        Mendukung komponen literal, wildcard (*, ?, [...]) dan '**'. Saat '**'
+        descend, symlink tidak diikuti dan directory di ignore_patterns di-prune.
+
+        Args:
+            pattern (str): Glob relatif ke current dir (mis. "src/**/*.py")
+
+        Yields:
+            os.DirEntry | Path: File yang match
+        """
+        parts = [p for p in pattern.split('/') if p and p != '.']
+        if not parts:
+            return
+        if parts[-1] == '**':
+            parts.append('*')  # trailing '**' = semua file di bawahnya
+        
+        literal_ignores = self._literal_ignores
+        ignore = self._ignore_re.match
+        last = len(parts) - 1
+        base = os.sep if pattern.startswith('/') else self._current_resolved
+        seen = set()  # '**' berulang bisa mencapai file yang sama dua kali
+        
+        # DFS iteratif: stack of (dirpath, index komponen pattern)
+        stack = [(base, 0)]
+        while stack:
+            dirpath, i = stack.pop()
+            part = parts[i]
+            
+            if not _has_magic(part):
+                child = os.path.join(dirpath, part)
+                if i == last:
+                    if os.path.isfile(child) and child not in seen:
+                        seen.add(child)
+                        yield Path(child)
+                elif os.path.isdir(child):
+                    stack.append((child, i + 1))
+                continue
+            
+            try:
+                with os.scandir(dirpath) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            
+            if part == '**':
+                subdirs = [(e.path, i) for e in entries
+                           if e.is_dir(follow_symlinks=False)
+                           and e.name not in literal_ignores and not ignore(e.name)]
+                stack.extend(reversed(subdirs))
+                stack.append((dirpath, i + 1))  # '**' = nol directory juga
+            elif i == last:
+                match = _compile_glob(part).match
+                for e in entries:
+                    if match(e.name) and e.is_file() and e.path not in seen:
+                        seen.add(e.path)
+                        yield e
+            else:
+                match = _compile_glob(part).match
+                stack.extend(reversed([(e.path, i + 1) for e in entries
+                                       if match(e.name) and e.is_dir()]))
+    
     def remove_from_context(self, pattern):
         """Remove file(s) from context"""
-        import fnmatch
         removed = 0
         
         if pattern == '*':
-            removed = len(self.context_files)
-            self.context_files.clear()
+            removed = self.clear_context_files()
         else:
-            to_remove = [k for k in self.context_files.keys() 
-                        if fnmatch.fnmatch(k, pattern)]
+            match = _compile_glob(pattern).match
+            to_remove = [k for k in self.context_files.keys() if match(k)]
             for key in to_remove:
                 del self.context_files[key]
+                self._context_stats.pop(key, None)
+                self._content_cache.pop(key, None)
+                self._untrack_folder(key)
                 removed += 1
         
         console.print(f"[green]✓ Removed {removed} file(s) from context[/green]")
 
+    def clear_context_files(self):
+        """
+        Clear all context files
+
+        Returns:
+            int: Number of files cleared
+        """
+        count = len(self.context_files)
+        self.context_files.clear()
+        self._context_stats.clear()
+        self._content_cache.clear()
+        self._folders.clear()
+        return count
+
+    def _untrack_folder(self, abs_path):
+        """Kurangi counter folder saat file keluar dari context"""
+        parent = os.path.dirname(abs_path)
+        remaining = self._folders.get(parent, 0) - 1
+        if remaining > 0:
+            self._folders[parent] = remaining
+        else:
+            self._folders.pop(parent, None)
+
     def add_paste_to_context(self, text):
         """
         Add pasted text to context with auto-generated ID
@@ -238,14 +679,12 @@ class FileSystemManager:
         Returns:
             str: Generated paste ID (e.g., "paste_001")
         """
-        from datetime import datetime
-
         self.paste_counter += 1
         paste_id = f"paste_{self.paste_counter:03d}"
 
         self.paste_contexts[paste_id] = {
             'content': text,
-            'timestamp': datetime.now(),
+            'timestamp': _now(),
             'lines': text.count('\n') + 1,
             'size': len(text)
         }
@@ -281,30 +720,23 @@ class FileSystemManager:
         return count
 
 
-    def _format_time_ago(self, timestamp):
+    def _format_time_ago(self, timestamp, now=None):
         """
         Format timestamp to relative time string
 
         Args:
             timestamp (datetime): Timestamp to format
+            now (datetime): Reference time, pass sekali untuk banyak item
 
         Returns:
             str: Relative time (e.g., "2m ago", "1h ago")
         """
-        from datetime import datetime
-
-        now = datetime.now()
-        diff = now - timestamp
-        seconds = diff.total_seconds()
-
-        if seconds < 60:
-            return f"{int(seconds)}s ago"
-        elif seconds < 3600:
-            return f"{int(seconds / 60)}m ago"
-        elif seconds < 86400:
-            return f"{int(seconds / 3600)}h ago"
-        else:
-            return f"{int(seconds / 86400)}d ago"
+        if now is None:
+            now = _now()
+        seconds = (now - timestamp).total_seconds()
+
+        divisor, suffix = _TIME_AGO_UNITS[bisect_right(_TIME_AGO_BOUNDS, seconds)]
+        return f"{int(seconds / divisor)}{suffix} ago"
 
     
     def list_context(self):
@@ -317,7 +749,7 @@ class FileSystemManager:
             return
         
         # Calculate total size
-        total_size = sum(f.stat().st_size for f in self.context_files.values())
+        total_size = sum(size for size, _ in self._context_stats.values())
         total_size += sum(p['size'] for p in self.paste_contexts.values())
         
         total_items = len(self.context_files) + len(self.paste_contexts)
@@ -327,61 +759,102 @@ class FileSystemManager:
         if has_files:
             console.print("\n[bold]Files:[/bold]")
             for abs_path, path_obj in self.context_files.items():
-                size = self._format_size(path_obj.stat().st_size)
+                size = self._format_size(self._context_stats[abs_path][0])
                 # Show relative to home for readability
-                try:
-                    rel_home = path_obj.relative_to(self.home_dir)
-                    display_path = f"~/{rel_home}"
-                except ValueError:
-                    display_path = abs_path
-                
+                display_path = self.display_path(abs_path)
                 console.print(f"  [white]• {display_path}[/white] [dim]({size})[/dim]")
             
             # Show pastes
             if has_pastes:
                 console.print("\n[bold]Pasted Content:[/bold]")
+                now = _now()
                 for paste_id, data in sorted(self.paste_contexts.items()):
                     size = self._format_size(data['size'])
                     lines = data['lines']
-                    time_ago = self._format_time_ago(data['timestamp'])
+                    time_ago = self._format_time_ago(data['timestamp'], now)
                     console.print(f"  [yellow]• {paste_id}[/yellow] [dim]({lines} lines, {size}) - {time_ago}[/dim]")
     
     
+    def stat_context_files(self):
+        """stat semua context file sekaligus, urutan sama dengan context_files"""
+        return _stat_grouped([os.fspath(p) for p in self.context_files.values()])
+    
     def get_context_for_api(self):
-        files_dict = {}
-        for abs_path, file_path in self.context_files.items():
+        """
+        Baca semua context file untuk dikirim ke API
+
+        File di atas SUMMARY_THRESHOLD diganti ringkasan referensi; hasil
+        di-cache per versi file (mtime, size) dan ikut dibuang saat @remove/@clear.
+
+        Returns:
+            list: (display_name, content, sha256) per file yang berhasil dibaca
+        """
+        if not self.context_files:
+            return []
+        
+        content_cache = self._content_cache
+        # stat dikelompokkan per directory dulu, lalu baca paralel
+        stats = self.stat_context_files()
+        
+        def _read(item):
+            (abs_path, file_path), st = item
             try:
-                content = file_path.read_text(encoding='utf-8')
-                # Stabil: relatif ke home_dir, fallback ke absolute
-                try:
-                    rel_home = file_path.relative_to(self.home_dir)
-                    key = f"~/{rel_home}"
-                except ValueError:
-                    key = str(file_path)  # absolute fallback
-                files_dict[key] = content
+                if isinstance(st, OSError):
+                    raise st
+                # Guard ukuran sebelum baca, file bisa membesar setelah @add
+                if st.st_size > MAX_CONTEXT_FILE_SIZE:
+                    raise ValueError(f"file too large (> {self._format_size(MAX_CONTEXT_FILE_SIZE)})")
+                # File tidak berubah sejak kirim terakhir: pakai cache, skip read
+                version = (st.st_mtime_ns, st.st_size)
+                cached = content_cache.get(abs_path)
+                if cached is not None and cached[0] == version:
+                    return cached, None
+                # Baca maksimal batas+1 byte: file bisa membesar antara stat dan read
+                with open(file_path, 'rb') as f:
+                    data = f.read(MAX_CONTEXT_FILE_SIZE + 1)
+                if len(data) > MAX_CONTEXT_FILE_SIZE:
+                    raise ValueError(f"file too large (> {self._format_size(MAX_CONTEXT_FILE_SIZE)})")
+                digest = hashlib.sha256(data).hexdigest()
+                if len(data) > SUMMARY_THRESHOLD:
+                    content = _summarize_file(file_path.name, data, digest)
+                else:
+                    content = data.decode('utf-8')
+                return (version, content, digest), None
             except Exception as e:
-                console.print(f"[yellow]⚠️ Failed to read {abs_path}: {e}[/yellow]")
-        return files_dict
-
+                return None, e
+        
+        entries = []
+        # Baca file paralel: I/O-bound, GIL dilepas selama syscall read
+        workers = min(MAX_READ_WORKERS, len(self.context_files))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            results = ex.map(_read, zip(self.context_files.items(), stats))
+            for abs_path, (entry, error) in zip(self.context_files, results):
+                if error is not None:
+                    console.print(f"[yellow]⚠️  Failed to read {abs_path}: {error}[/yellow]")
+                    continue
+                content_cache[abs_path] = entry
+                # Stabil: relatif ke home_dir, fallback ke absolute
+                entries.append((self.display_path(abs_path), entry[1], entry[2]))
+        return entries
     
     def get_relative_path(self):
         """Get current path relative to home"""
-        try:
-            rel = self.current_dir.relative_to(self.home_dir)
-            return f"~/{rel}" if str(rel) != '.' else "~"
-        except ValueError:
-            return str(self.current_dir)
+        if self._current_resolved == self._home_resolved:
+            return "~"
+        return self.display_path(self._current_resolved)
+    
+    def display_path(self, abs_path):
+        """Path absolut (resolved) -> "~/..." via prefix string, tanpa relative_to/exception"""
+        if abs_path.startswith(self._home_prefix):
+            return "~/" + abs_path[len(self._home_prefix):]
+        return abs_path
     
     def _show_context_summary(self):
         """Show quick summary of context structure"""
-        folders = set()
-        for name, path in self.context_files.items():
-            try:
-                rel = path.relative_to(self.current_dir)
-                if rel.parent != Path('.'):
-                    folders.add(str(rel.parent))
-            except:
-                pass
+        # Iterasi per folder (bukan per file), relatif ke current dir via prefix
+        prefix = self._current_resolved.rstrip(os.sep) + os.sep
+        folders = [parent[len(prefix):] for parent in self._folders
+                   if parent.startswith(prefix)]
         
         if folders:
             console.print(f"[dim]Folders: {', '.join(sorted(folders))}[/dim]")
@@ -389,17 +862,15 @@ class FileSystemManager:
     def _is_binary(self, filepath):
         """Check if file is binary"""
         try:
-            with open(filepath, 'rb') as f:
-                chunk = f.read(1024)
-                return b'\x00' in chunk
-        except:
+            # Raw fd + os.read: tanpa file object / buffered IO layer
+            fd = os.open(filepath, os.O_RDONLY)
+            try:
+                chunk = os.read(fd, 512)
+            finally:
+                os.close(fd)
+            return b'\x00' in chunk
+        except OSError:
             return True
     
-    @staticmethod
-    def _format_size(size):
-        """Format file size"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024:
-                return f"{size:.1f}{unit}"
-            size /= 1024
-        return f"{size:.1f}TB"
+    # Satu implementasi dengan lib.paste_detector.format_size
+    _format_size = staticmethod(format_size)
@@ -1,37 +1,52 @@
 import json
 
 
+_decode_json = json.JSONDecoder().decode
+
+
 def extract_answer_from_response(resp):
     """Extract answer dari Perplexity response"""
     if not resp or 'text' not in resp:
         return "Error: No response from API"
     
     text_content = resp['text']
+    text_type = type(text_content)
+    
+    # Fast path: text non-search biasanya langsung str/dict (hasil json, bukan subclass)
+    if text_type is str:
+        return text_content
+    if text_type is dict:
+        return str(text_content)
     
     if isinstance(text_content, list):
         try:
-            final_step = next((step for step in text_content 
-                             if isinstance(step, dict) and step.get('step_type') == 'FINAL'), None)
+            # FINAL step biasanya paling akhir: scan dari belakang
+            final_step = None
+            for step in reversed(text_content):
+                if type(step) is dict and step.get('step_type') == 'FINAL':
+                    final_step = step
+                    break
             
-            if final_step and 'content' in final_step:
+            if final_step is not None and 'content' in final_step:
                 content = final_step['content']
-                if isinstance(content, dict) and 'answer' in content:
+                if type(content) is dict and 'answer' in content:
                     answer_content = content['answer']
-                    if isinstance(answer_content, str):
+                    answer_type = type(answer_content)
+                    if answer_type is str:
                         try:
-                            answer_json = json.loads(answer_content)
+                            answer_json = _decode_json(answer_content)
                             return answer_json.get('answer', str(answer_json))
-                        except:
+                        except Exception:
                             return answer_content
-                    elif isinstance(answer_content, dict):
+                    elif answer_type is dict:
                         return answer_content.get('answer', str(answer_content))
                     else:
                         return str(answer_content)
                 return str(content)
             
-            elif text_content:
+            if text_content:
                 last_step = text_content[-1]
-                if isinstance(last_step, dict) and 'content' in last_step:
+                if type(last_step) is dict and 'content' in last_step:
                     return str(last_step['content'])
                 return str(last_step)
             
@@ -48,7 +63,7 @@ def extract_answer_from_response(resp):
 
 
 def show_search_results_simple(steps, console):
-    """Show web sources used"""
+    """Show web sources used, return True jika step SEARCH_RESULTS ditemukan"""
     for step in steps:
         if step.get('step_type') == 'SEARCH_RESULTS':
             web_results = []
@@ -62,4 +77,5 @@ def show_search_results_simple(steps, console):
                     url = r.get('url', '-')
                     domain = url.split('//')[-1].split('/')[0]
                     console.print(f"[bold cyan]{i}.[/bold cyan] [white]{name}[/white] [dim]-[/dim] [yellow]{domain}[/yellow]")
-            break
\ No newline at end of file
+            return True
+    return False
\ No newline at end of file
@@ -2,16 +2,70 @@
 AI query handler with context support
 """
 
+import asyncio
+import io
+
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 from rich.rule import Rule
-from rich.markdown import Markdown
+from rich.text import Text
 
 from core.response_handler import extract_answer_from_response, show_search_results_simple
 
 console = Console()
 
+# Budget per file yang di-embed; file lebih besar dikirim head+tail saja
+MAX_EMBED_CHARS = 24_000
+EMBED_HEAD_LINES = 80
+EMBED_TAIL_LINES = 80
+STREAM_QUEUE_SIZE = 32  # chunk yang boleh antre antara network read dan render
+
+
+def _truncate_middle(content):
+    """Potong bagian tengah file besar, sisakan head+tail supaya muat di context window"""
+    if len(content) <= MAX_EMBED_CHARS:
+        return content
+    lines = content.splitlines()
+    elided = len(lines) - EMBED_HEAD_LINES - EMBED_TAIL_LINES
+    if elided > 0:
+        head = '\n'.join(lines[:EMBED_HEAD_LINES])
+        tail = '\n'.join(lines[-EMBED_TAIL_LINES:])
+        truncated = f"{head}\n... ({elided} lines elided) ...\n{tail}"
+        if len(truncated) <= MAX_EMBED_CHARS:
+            return truncated
+    # Baris terlalu panjang (minified, log satu baris): potong per karakter
+    half = MAX_EMBED_CHARS // 2
+    return f"{content[:half]}\n... ({len(content) - 2 * half} chars elided) ...\n{content[-half:]}"
+
+
+async def _iter_steps(resp):
+    """Yield list step per chunk, untuk response stream maupun dict tunggal"""
+    if hasattr(resp, '__aiter__'):
+        async for chunk in resp:
+            # Satu lookup; chunk bukan dict / tanpa 'text' jatuh ke except
+            try:
+                steps = chunk['text']
+            except (TypeError, KeyError):
+                continue
+            if isinstance(steps, list):
+                yield steps
+    elif isinstance(resp, dict):
+        if 'text' in resp and isinstance(resp['text'], list):
+            yield resp['text']
+
+
+async def _produce_steps(resp, queue):
+    """Drain stream API ke queue; None menandai akhir, exception diteruskan ke consumer"""
+    try:
+        async for steps in _iter_steps(resp):
+            await queue.put(steps)
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(None)
+
+
 async def handle_ai_query(query, fs_manager, perplexity_cli):
     """
     Handle AI query dengan file context dan paste context
@@ -43,17 +97,24 @@ async def handle_ai_query(query, fs_manager, perplexity_cli):
             task = progress.add_task("[cyan]Processing query...", total=None)
             
             # ✅ BUILD CONTEXT dari files + pastes
-            context_parts = []
+            # Tulis langsung ke satu buffer, tanpa string per-block + join
+            buf = io.StringIO()
+            write = buf.write
             
             if fs_manager.context_files:
-                for abs_path, file_path in fs_manager.context_files.items():
-                    try:
-                        content = file_path.read_text(encoding='utf-8')
-                        # Display dengan path yang jelas
-                        display_name = abs_path.replace(str(fs_manager.home_dir), '~')
-                        context_parts.append(f"```{display_name}\n{content}\n```")
-                    except Exception as e:
-                        console.print(f"[yellow]⚠️  Failed to read {abs_path}: {e}[/yellow]")
+                # Baca (stat, guard ukuran, ringkasan, cache) di thread, event loop tetap jalan
+                entries = await asyncio.to_thread(fs_manager.get_context_for_api)
+                seen = {}  # sha256 -> display name, isi identik cukup dikirim sekali
+                for display_name, content, digest in entries:
+                    write('```')
+                    write(display_name)
+                    write('\n')
+                    original = seen.setdefault(digest, display_name)
+                    if original == display_name:
+                        write(_truncate_middle(content))
+                    else:
+                        write(f"(identical to {original})")
+                    write('\n```\n\n')
 
             
             # Add paste contexts
@@ -61,12 +122,15 @@ async def handle_ai_query(query, fs_manager, perplexity_cli):
                 for paste_id, data in fs_manager.paste_contexts.items():
                     content = data['content']
                     lines = data['lines']
-                    context_parts.append(f"```{paste_id} ({lines} lines)\n{content}\n```")
+                    write(f"```{paste_id} ({lines} lines)\n")
+                    write(content)
+                    write('\n```\n\n')
             
             # Build final query dengan context
-            if context_parts:
-                context_block = "\n\n".join(context_parts)
-                final_query = f"{context_block}\n\n---\n\n{query}"
+            if buf.tell():
+                write('---\n\n')
+                write(query)
+                final_query = buf.getvalue()
                 console.print(f"[dim]Embedded {total_items} item(s) into query[/dim]")
             else:
                 final_query = query
@@ -83,28 +147,46 @@ async def handle_ai_query(query, fs_manager, perplexity_cli):
             # Send query
             resp = await perplexity_cli.search(final_query, **api_params)
             
-            # Process response
-            all_steps = []
-            if hasattr(resp, '__aiter__'):
-                async for chunk in resp:
-                    if isinstance(chunk, dict) and 'text' in chunk:
-                        if isinstance(chunk['text'], list):
-                            all_steps.extend(chunk['text'])
-            elif isinstance(resp, dict):
-                if 'text' in resp and isinstance(resp['text'], list):
-                    all_steps.extend(resp['text'])
+            # Process response per chunk: sources tampil begitu datang,
+            # hanya step yang dibutuhkan untuk answer yang disimpan
+            final_step = last_step = None
+            sources_shown = False
+            # Network read jalan di task sendiri, render lambat tidak menahan stream
+            queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+            producer = asyncio.create_task(_produce_steps(resp, queue))
+            try:
+                while True:
+                    steps = await queue.get()
+                    if steps is None:
+                        break
+                    if isinstance(steps, Exception):
+                        raise steps
+                    if not steps:
+                        continue
+                    if not sources_shown:
+                        sources_shown = show_search_results_simple(steps, console)
+                    for step in reversed(steps):
+                        if type(step) is dict and step.get('step_type') == 'FINAL':
+                            final_step = step
+                            break
+                    last_step = steps[-1]
+            finally:
+                producer.cancel()
             
             progress.remove_task(task)
         
         # Show results
-        show_search_results_simple(all_steps, console)
-        answer = extract_answer_from_response({'text': all_steps})
+        answer_steps = [final_step or last_step] if last_step is not None else []
+        answer = extract_answer_from_response({'text': answer_steps})
         
         console.print(Rule(title="Answer", style="bright_green"))
-        if isinstance(answer, str) and '```':
+        if isinstance(answer, str) and '```' in answer:
+            # Lazy import: rich.markdown menarik Pygments, jangan bayar saat startup
+            from rich.markdown import Markdown
             console.print(Markdown(answer))
         else:
-            console.print(Panel(answer, border_style="bright_blue", padding=(1,2)))
+            # Text: jawaban model bukan Rich markup ([..] jangan di-parse)
+            console.print(Panel(Text(str(answer)), border_style="bright_blue", padding=(1,2)))
         console.print(Rule(style="bright_green"))
         
     except Exception as e:
@@ -7,56 +7,74 @@ from rich.console import Console
 console = Console()
 
 
+def _add(args, fs_manager):
+    if not args:
+        console.print("[yellow]Usage: @add <pattern>[/yellow]")
+        console.print("[dim]Example: @add *.py[/dim]")
+        return
+    pattern = ' '.join(args)
+    fs_manager.add_to_context(pattern)
+
+
+def _remove(args, fs_manager):
+    if not args:
+        console.print("[yellow]Usage: @remove <pattern>[/yellow]")
+        console.print("[dim]Example: @remove *.py or @remove paste_001[/dim]")
+        return
+    pattern = ' '.join(args)
+    
+    # Check if removing paste by ID
+    if pattern.startswith('paste_'):
+        if fs_manager.remove_paste_from_context(pattern):
+            console.print(f"[green]✓ Removed {pattern} from context[/green]")
+        else:
+            console.print(f"[yellow]⚠️  Paste not found: {pattern}[/yellow]")
+    else:
+        # Remove file pattern
+        fs_manager.remove_from_context(pattern)
+
+
+def _list(args, fs_manager):
+    fs_manager.list_context()
+
+
+def _clear(args, fs_manager):
+    # Clear both files and pastes
+    file_count = fs_manager.clear_context_files()
+    paste_count = fs_manager.clear_paste_contexts()
+    
+    total = file_count + paste_count
+    console.print(f"[green]✓ Cleared {total} item(s) from context ({file_count} files, {paste_count} pastes)[/green]")
+
+
+def _unknown(cmd):
+    console.print(f"[yellow]Unknown command: {cmd}[/yellow]")
+    console.print("[dim]Available: @add, @remove/@rm, @list/@ls, @clear[/dim]")
+
+
+# Satu lookup dict per command, bukan rantai if/elif
+_CTX_DISPATCH = {
+    '@add': _add,
+    '@remove': _remove,
+    '@rm': _remove,
+    '@list': _list,
+    '@ls': _list,
+    '@clear': _clear,
+}
+
+
 async def handle_context_command(cmd, args, fs_manager):
     """
     Handle @-prefixed context commands
     
     Commands:
         @add <pattern>   - Add files to context
-        @remove <pattern> - Remove files/pastes from context
-        @list            - List all context items
+        @remove <pattern> - Remove files/pastes from context (alias: @rm)
+        @list            - List all context items (alias: @ls)
         @clear           - Clear all context (files + pastes)
     """
-    
-    if cmd == '@add':
-        if not args:
-            console.print("[yellow]Usage: @add <pattern>[/yellow]")
-            console.print("[dim]Example: @add *.py[/dim]")
-            return
-        pattern = ' '.join(args)
-        fs_manager.add_to_context(pattern)
-    
-    elif cmd == '@remove':
-        if not args:
-            console.print("[yellow]Usage: @remove <pattern>[/yellow]")
-            console.print("[dim]Example: @remove *.py or @remove paste_001[/dim]")
-            return
-        pattern = ' '.join(args)
-        
-        # Check if removing paste by ID
-        if pattern.startswith('paste_'):
-            if fs_manager.remove_paste_from_context(pattern):
-                console.print(f"[green]✓ Removed {pattern} from context[/green]")
-            else:
-                console.print(f"[yellow]⚠️  Paste not found: {pattern}[/yellow]")
-        else:
-            # Remove file pattern
-            fs_manager.remove_from_context(pattern)
-    
-    elif cmd in ['@list', '@ls']:
-        fs_manager.list_context()
-    
-    elif cmd == '@clear':
-        # Clear both files and pastes
-        file_count = len(fs_manager.context_files)
-        paste_count = len(fs_manager.paste_contexts)
-        
-        fs_manager.context_files.clear()
-        fs_manager.paste_contexts.clear()
-        
-        total = file_count + paste_count
-        console.print(f"[green]✓ Cleared {total} item(s) from context ({file_count} files, {paste_count} pastes)[/green]")
-    
-    else:
-        console.print(f"[yellow]Unknown command: {cmd}[/yellow]")
-        console.print("[dim]Available: @add, @remove, @list/@ls, @clear[/dim]")
+    handler = _CTX_DISPATCH.get(cmd)
+    if handler is None:
+        _unknown(cmd)
+        return
+    handler(args, fs_manager)
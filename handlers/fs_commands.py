@@ -3,25 +3,43 @@ from rich.console import Console
 console = Console()
 
 
+def _ls(args, fs_manager):
+    path = args[0] if args else None
+    fs_manager.ls(path)
+
+
+def _cd(args, fs_manager):
+    path = args[0] if args else None
+    fs_manager.cd(path)
+
+
+def _pwd(args, fs_manager):
+    fs_manager.pwd()
+
+
+def _cat(args, fs_manager):
+    if not args:
+        console.print("[red]Usage: cat <filename>[/red]")
+        return
+    fs_manager.cat(args[0])
+
+
+def _tree(args, fs_manager):
+    path = args[0] if args else None
+    fs_manager.tree(path)
+
+
+_FS_DISPATCH = {
+    'ls': _ls,
+    'cd': _cd,
+    'pwd': _pwd,
+    'cat': _cat,
+    'tree': _tree,
+}
+
+
 async def handle_fs_command(cmd, args, fs_manager):
     """Handle filesystem commands"""
-    if cmd == 'ls':
-        path = args[0] if args else None
-        fs_manager.ls(path)
-    
-    elif cmd == 'cd':
-        path = args[0] if args else None
-        fs_manager.cd(path)
-    
-    elif cmd == 'pwd':
-        fs_manager.pwd()
-    
-    elif cmd == 'cat':
-        if not args:
-            console.print("[red]Usage: cat <filename>[/red]")
-            return
-        fs_manager.cat(args[0])
-    
-    elif cmd == 'tree':
-        path = args[0] if args else None
-        fs_manager.tree(path)
\ No newline at end of file
+    handler = _FS_DISPATCH.get(cmd)
+    if handler is not None:
+        handler(args, fs_manager)
@@ -2,67 +2,278 @@
 System command executor with user shell environment
 """
 
-import subprocess
+import asyncio
+import codecs
 import os
+import secrets
+import shlex
+import signal
+import sys
 from rich.console import Console
 
 console = Console()
 
+COMMAND_TIMEOUT = 30
+READ_CHUNK_SIZE = 65536
+KILL_WAIT_TIMEOUT = 2  # batas tunggu reap setelah SIGKILL
 
-def execute_system_command(command):
+# Shell persistent: spawn + source rc sekali, command berikutnya tinggal dikirim via stdin
+_shell = None
+# Protokol marker butuh syntax POSIX ( ... ), eval, $?; shell lain satu process per command
+_POSIX_SHELLS = frozenset(('sh', 'dash', 'bash', 'zsh'))
+
+
+async def _get_shell(user_shell):
+    """Return shell persistent, spawn baru jika belum ada atau sudah mati"""
+    global _shell
+    if _shell is not None and _shell.returncode is None:
+        return _shell
+    
+    _shell = await asyncio.create_subprocess_exec(
+        user_shell,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        process_group=0  # process group sendiri (killpg), tetap punya controlling terminal
+    )
+    
+    # Source shell config sekali saat spawn
+    if 'zsh' in user_shell:
+        _shell.stdin.write(b'source ~/.zshrc 2>/dev/null\n')
+    elif 'bash' in user_shell:
+        _shell.stdin.write(b'source ~/.bashrc 2>/dev/null\n')
+    return _shell
+
+
+async def close_system_shell():
+    """Tutup shell persistent (dipanggil saat exit)"""
+    global _shell
+    if _shell is not None and _shell.returncode is None:
+        _shell.stdin.close()
+        try:
+            await asyncio.wait_for(_shell.wait(), timeout=1)
+        except asyncio.TimeoutError:
+            await _kill_shell(_shell)
+    _shell = None
+
+
+async def _kill_shell(shell):
+    """Kill shell beserta command yang masih jalan (satu process group)"""
+    try:
+        os.killpg(shell.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    # wait() asyncio baru selesai setelah semua pipe putus: pipe penuh yang
+    # reader-nya sudah dibatalkan tidak pernah EOF, dan grandchild setsid bisa
+    # menahan pipe tetap terbuka. Tutup transport dulu, tunggu reap dengan batas
+    shell._transport.close()
+    try:
+        await asyncio.wait_for(shell.wait(), timeout=KILL_WAIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+
+
+def _interrupt_command(shell, state):
+    """Ctrl-C saat command jalan: teruskan SIGINT ke process group command, bukan ke REPL"""
+    state['interrupted'] = True
+    try:
+        os.killpg(shell.pid, signal.SIGINT)
+    except ProcessLookupError:
+        pass
+
+
+def _terminal_fd():
+    """fd terminal jika REPL jalan di tty, None jika tidak (pipe, test)"""
+    try:
+        fd = sys.stdin.fileno()
+    except (AttributeError, ValueError, OSError):
+        return None
+    return fd if os.isatty(fd) else None
+
+
+def _set_foreground(tty_fd, pgid):
+    """Jadikan pgid foreground process group terminal, return pgid sebelumnya"""
+    previous = os.tcgetpgrp(tty_fd)
+    os.tcsetpgrp(tty_fd, pgid)
+    return previous
+
+
+async def _read_until(stream, marker, emit):
+    """Teruskan output ke emit per chunk sampai marker (None: sampai EOF), return teks setelah marker"""
+    # Simpan ekor sepanjang marker-1 byte: marker bisa terpotong di batas chunk
+    keep = len(marker) - 1 if marker is not None else 0
+    pending = b''
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            # EOF: process selesai, atau shell mati sebelum marker
+            if pending:
+                emit(pending)
+            return None
+        data = pending + chunk
+        pos = data.find(marker) if marker is not None else -1
+        if pos != -1:
+            # Output tanpa newline akhir menempel di baris marker
+            if pos:
+                emit(data[:pos])
+            rest = data[pos + len(marker):]
+            while b'\n' not in rest:
+                more = await stream.read(READ_CHUNK_SIZE)
+                if not more:
+                    break
+                rest += more
+            return rest.split(b'\n', 1)[0].strip()
+        cut = max(len(data) - keep, 0)
+        if cut:
+            emit(data[:cut])
+        pending = data[cut:]
+
+
+async def _send_to_shell(user_shell, command, tty_path):
+    """Kirim command ke shell persistent, return (shell, marker akhir output)"""
+    shell = await _get_shell(user_shell)
+    
+    # Subshell: cd/exit/variable tidak bocor ke command berikutnya,
+    # stdin dari terminal (atau /dev/null) supaya tidak ikut membaca pipe protokol.
+    # Command dikirim sebagai satu kata ter-quote untuk eval: parse error
+    # (quote tidak tertutup, heredoc) tetap di dalam eval dan jadi $?
+    marker = f"__MTA_DONE_{secrets.token_hex(8)}__".encode()
+    script = (
+        b'( eval ' + shlex.quote(command).encode() + b' ) <'
+        + shlex.quote(tty_path or '/dev/null').encode() + b'\n'
+        b'echo "' + marker + b'$?"\n'
+        b'echo "' + marker + b'" >&2\n'
+    )
+    shell.stdin.write(script)
+    await shell.stdin.drain()
+    return shell, marker
+
+
+async def execute_system_command(command):
     """
     Execute system command in user's configured shell environment
     """
+    global _shell
     try:
         # Show command being executed
         console.print(f"[dim]$ {command}[/dim]")
         
         # Detect user's shell
         user_shell = os.environ.get('SHELL', '/bin/bash')
-        
-        # Build command that sources shell config
-        # For interactive-like behavior, use -i flag or source config
-        if 'zsh' in user_shell:
-            # For zsh: source .zshrc
-            wrapped_cmd = f'source ~/.zshrc 2>/dev/null; {command}'
-        elif 'bash' in user_shell:
-            # For bash: source .bashrc
-            wrapped_cmd = f'source ~/.bashrc 2>/dev/null; {command}'
+        persistent = os.path.basename(user_shell) in _POSIX_SHELLS
+        tty_fd = _terminal_fd()
+        if persistent:
+            tty_path = os.ttyname(tty_fd) if tty_fd is not None else None
+            proc, marker = await _send_to_shell(user_shell, command, tty_path)
         else:
-            # Fallback: just run command
-            wrapped_cmd = command
+            # fish/tcsh/nushell: tanpa protokol marker, output dibaca sampai EOF
+            proc = await asyncio.create_subprocess_shell(
+                command,
+                executable=user_shell,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                process_group=0
+            )
+            marker = None
+        
+        # stdout langsung tampil begitu datang; stderr dikumpulkan karena
+        # warnanya tergantung exit code
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        stderr_chunks = []
+        
+        def emit_stdout(data):
+            text = decoder.decode(data)
+            if text:
+                console.out(text, end='', highlight=False)
         
-        # Execute command
-        result = subprocess.run(
-            wrapped_cmd,
-            shell=True,
-            executable=user_shell,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        loop = asyncio.get_running_loop()
+        previous_handler = signal.getsignal(signal.SIGINT)
+        state = {'interrupted': False}
+        loop.add_signal_handler(signal.SIGINT, _interrupt_command, proc, state)
+        # Terminal diserahkan ke process group command selama jalan: prompt
+        # sudo/ssh/git bisa baca /dev/tty dan Ctrl-C langsung ke command.
+        # SIGTTOU diabaikan supaya REPL (sementara background) tetap bisa
+        # menulis output dan mengambil kembali terminal
+        foreground = None
+        previous_ttou = None
+        if tty_fd is not None:
+            previous_ttou = signal.signal(signal.SIGTTOU, signal.SIG_IGN)
+            try:
+                foreground = _set_foreground(tty_fd, proc.pid)
+                # Command yang sudah sempat baca terminal sebelum handoff
+                # berhenti karena SIGTTIN: lanjutkan
+                os.killpg(proc.pid, signal.SIGCONT)
+            except OSError:
+                pass
+        timed_out = False
+        try:
+            rc, _ = await asyncio.wait_for(
+                asyncio.gather(
+                    _read_until(proc.stdout, marker, emit_stdout),
+                    _read_until(proc.stderr, marker, stderr_chunks.append)
+                ),
+                timeout=COMMAND_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
+        finally:
+            if foreground is not None:
+                try:
+                    _set_foreground(tty_fd, foreground)
+                except OSError:
+                    pass
+            if previous_ttou is not None:
+                signal.signal(signal.SIGTTOU, previous_ttou)
+            loop.remove_signal_handler(signal.SIGINT)
+            signal.signal(signal.SIGINT, previous_handler)
+        
+        if timed_out:
+            # Terminal dan signal sudah dikembalikan ke REPL sebelum kill.
+            # State shell tidak diketahui: matikan, spawn ulang di command berikutnya
+            await _kill_shell(proc)
+            if persistent:
+                _shell = None
+            console.print(f"[red]❌ Command timeout ({COMMAND_TIMEOUT}s limit)[/red]")
+            return
+        
+        if rc is None:
+            # Process non-POSIX selesai, atau shell persistent mati
+            if persistent:
+                _shell = None
+            returncode = await proc.wait()
+            # Ctrl-C dari terminal langsung ke process group command
+            if returncode == -signal.SIGINT:
+                state['interrupted'] = True
+        else:
+            returncode = int(rc)
         
-        # Display output
-        if result.stdout:
-            console.print(result.stdout, end='')
+        if state['interrupted']:
+            # Shell ikut menerima SIGINT, state-nya tidak bisa dipercaya lagi
+            await _kill_shell(proc)
+            if persistent:
+                _shell = None
+            console.print("[yellow]⚠️  Interrupted[/yellow]")
+            return
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            console.out(tail, end='', highlight=False)
+        stderr = b''.join(stderr_chunks).decode('utf-8', errors='replace')
         
         # Display errors
-        if result.stderr:
+        if stderr:
             # Some commands write to stderr even on success
-            if result.returncode == 0:
+            if returncode == 0:
                 # Success but has stderr (warnings, etc)
-                console.print(f"[yellow]{result.stderr}[/yellow]", end='')
+                console.print(f"[yellow]{stderr}[/yellow]", end='')
             else:
                 # Actual error
-                console.print(f"[red]{result.stderr}[/red]", end='')
+                console.print(f"[red]{stderr}[/red]", end='')
         
         # Show return code if non-zero
-        if result.returncode != 0:
-            console.print(f"[yellow]⚠️  Exit code: {result.returncode}[/yellow]")
-            
-    except subprocess.TimeoutExpired:
-        console.print("[red]❌ Command timeout (30s limit)[/red]")
+        if returncode != 0:
+            console.print(f"[yellow]⚠️  Exit code: {returncode}[/yellow]")
+    
     except FileNotFoundError:
-        console.print(f"[red]❌ Command not found: {command.split()[0]}[/red]")
+        console.print(f"[red]❌ Shell not found: {os.environ.get('SHELL', '/bin/bash')}[/red]")
     except Exception as e:
-        console.print(f"[red]❌ Error: {e}[/red]")
\ No newline at end of file
+        console.print(f"[red]❌ Error: {e}[/red]")
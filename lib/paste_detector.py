@@ -35,6 +35,9 @@ def detect_multiline_paste(text):
     return is_paste, stats
 
 
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
 def format_size(size):
     """
     Format byte size to human readable string
@@ -45,11 +48,11 @@ def format_size(size):
     Returns:
         str: Formatted size (e.g., "1.5KB", "2.3MB")
     """
-    for unit in ['B', 'KB', 'MB']:
-        if size < 1024:
-            return f"{size:.1f}{unit}"
-        size /= 1024
-    return f"{size:.1f}GB"
+    if size < 1024:
+        return f"{size:.1f}B"
+    # bit_length langsung memberi index unit (log1024), tanpa loop pembagian
+    idx = min((size.bit_length() - 1) // 10, 4)
+    return f"{size / (1 << (10 * idx)):.1f}{_SIZE_UNITS[idx]}"
 
 
 def create_preview(text, max_lines=3):
@@ -63,13 +66,12 @@ def create_preview(text, max_lines=3):
     Returns:
         str: Preview text with indication of remaining lines
     """
-    lines = text.split('\n')
-    if len(lines) <= max_lines:
-        return text
-    
-    preview_lines = lines[:max_lines]
-    remaining = len(lines) - max_lines
-    preview = '\n'.join(preview_lines)
-    preview += f"\n... ({remaining} more lines)"
+    # Cari posisi newline ke-max_lines saja, tanpa split seluruh text
+    idx = -1
+    for _ in range(max_lines):
+        idx = text.find('\n', idx + 1)
+        if idx == -1:
+            return text
     
-    return preview
+    remaining = text.count('\n', idx + 1) + 1
+    return text[:idx] + f"\n... ({remaining} more lines)"
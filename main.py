@@ -11,11 +11,13 @@ from lib.paste_detector import detect_multiline_paste
 from handlers.fs_commands import handle_fs_command
 from handlers.context_commands import handle_context_command
 from handlers.ai_query import handle_ai_query
-from handlers.system_commands import execute_system_command
+from handlers.system_commands import execute_system_command, close_system_shell
 from handlers.paste_handler import handle_paste
 
 console = Console()
 
+_FS_CMDS = frozenset(('ls', 'cd', 'pwd', 'cat', 'tree'))
+
 
 async def main():
     console.print("\n[dim]Initializing Perplexity AI Client...[/dim]")
@@ -80,7 +82,7 @@ async def main():
                     break
                 
                 # Handle filesystem commands
-                elif cmd in ['ls', 'cd', 'pwd', 'cat', 'tree']:
+                elif cmd in _FS_CMDS:
                     await handle_fs_command(cmd, args, fs_manager)
                 
                 # Handle context commands
@@ -89,7 +91,7 @@ async def main():
                 
                 # Handle system commands (fallback)
                 else:
-                    execute_system_command(user_input)
+                    await execute_system_command(user_input)
                     
             except (EOFError, KeyboardInterrupt):
                 console.print("\n[bold yellow]👋 Goodbye![/bold yellow]")
@@ -100,6 +102,8 @@ async def main():
         console.print(f"[red]❌ Failed: {e}[/red]")
         import traceback
         traceback.print_exc()
+    finally:
+        await close_system_shell()
 
 
 if __name__ == "__main__":
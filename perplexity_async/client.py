@@ -10,6 +10,17 @@ from curl_cffi import requests, CurlMime
 
 from .emailnator import Emailnator
 
+try:
+    # Optional: orjson jauh lebih cepat dan langsung parse bytes
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+_MESSAGE_EVENT = b'event: message\r\n'
+_MESSAGE_PREFIX_LEN = len(b'event: message\r\ndata: ')
+_END_EVENT = b'event: end_of_stream\r\n'
+
 
 
 class AsyncMixin:
@@ -202,42 +213,39 @@ class Client(AsyncMixin):
             }
 
         resp = await self.session.post('https://www.perplexity.ai/rest/sse/perplexity_ask', json=json_data, stream=True)
-        chunks = []
 
         async def stream_response(resp):
             async for chunk in resp.aiter_lines(delimiter=b'\r\n\r\n'):
-                content = chunk.decode('utf-8')
-
-                if content.startswith('event: message\r\n'):
-                    content_json = json.loads(content[len('event: message\r\ndata: '):])
+                # Parse bytes langsung, tanpa decode ke str dulu
+                if chunk.startswith(_MESSAGE_EVENT):
+                    content_json = _json_loads(chunk[_MESSAGE_PREFIX_LEN:])
                     try:
                         if content_json.get('text'):
-                            content_json['text'] = json.loads(content_json['text'])
+                            content_json['text'] = _json_loads(content_json['text'])
                     except (json.JSONDecodeError, TypeError):
                         pass
                     
-                    chunks.append(content_json)
-                    yield chunks[-1]
+                    # Stream: langsung yield, chunk lama tidak ditahan di memory
+                    yield content_json
 
-                elif content.startswith('event: end_of_stream\r\n'):
+                elif chunk.startswith(_END_EVENT):
                     return
 
         if stream:
             return stream_response(resp)
 
+        last_chunk = {}  # non-stream: hanya message terakhir yang dikembalikan
         async for chunk in resp.aiter_lines(delimiter=b'\r\n\r\n'):
-            content = chunk.decode('utf-8')
-
-            if content.startswith('event: message\r\n'):
-                content_json = json.loads(content[len('event: message\r\ndata: '):])
+            if chunk.startswith(_MESSAGE_EVENT):
+                content_json = _json_loads(chunk[_MESSAGE_PREFIX_LEN:])
 
                 try:
                     if content_json.get('text'):
-                        content_json['text'] = json.loads(content_json['text'])
+                        content_json['text'] = _json_loads(content_json['text'])
                 except (json.JSONDecodeError, TypeError):
                     pass
                 
-                chunks.append(content_json)
+                last_chunk = content_json
 
-            elif content.startswith('event: end_of_stream\r\n'):
-                return chunks[-1] if chunks else {}
+            elif chunk.startswith(_END_EVENT):
+                return last_chunk